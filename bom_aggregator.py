@@ -0,0 +1,401 @@
+import os
+import re
+import csv
+import json
+from functools import lru_cache
+from typing import List, Dict, Any, Optional
+
+# Columns of the consolidated bill of materials, in output order
+BOM_COLUMNS = [
+    "item_type",
+    "model_or_spec",
+    "dimensions",
+    "raw_dimensions",
+    "mounting_type",
+    "quantity",
+    "unparsed_quantities",
+    "occurrences",
+    "pages",
+    "min_confidence",
+]
+
+# Values the model uses to say "nothing here"
+_EMPTY_VALUES = {"", "N/A", "NA", "NONE", "NULL", "-", "UNKNOWN", "NOT SPECIFIED"}
+
+# Mixed number (1-1/2, 1 1/2), plain fraction (3/4) or decimal (1.5)
+_NUMBER_PATTERN = r'(?:(\d+)[\s-]+(\d+)/(\d+)|(\d+)/(\d+)|(\d+(?:\.\d+)?))'
+# A size, optionally followed by an inch mark, a feet/metric unit and/or a diameter marker
+_SIZE_RE = re.compile(
+    r'(?<![\d./])' + _NUMBER_PATTERN +
+    r'(\s*(?:"|”|″|\'\'|IN\.?(?![A-Z])|INCH(?:ES)?\b))?'
+    r'(\s*(?:\'|’|FT\b|FEET\b|MM\b|CM\b|M\b))?'
+    r'(\s*(?:Ø|⌀|DIA(?:METER)?\b|DIAM\b))?'
+)
+# Checked against the few characters before a size match. A number directly after letters
+# (DN50, A1-2/3), after SCH/CLASS or in the inch part of feet-inches (10'-6") is not an inch
+# size, but the X of a reducer size (1-1/2"X3/4", 2X1-1/2") is only a separator.
+_SIZE_PREFIX_WINDOW = 16
+_NOT_SIZE_PREFIX_RE = re.compile(
+    r'(?:[A-WYZ]|(?<![\d"”″\'\s])X|\b(?:SCH|SCHEDULE|CLASS)\s*)[\d./-]*$|[\'’]\s*-?\s*$'
+)
+_DIAMETER_PREFIX_RE = re.compile(r'[Ø⌀]\s*$')
+# "2 x 1.5\"" / "1.5\" x 2": a bare number on one side of a reducer size takes the other's inch mark
+_BARE_BEFORE_INCH_RE = re.compile(r'(?<![\w."])(\d+(?:\.\d+)?)(?=\s*x\s*\d+(?:\.\d+)?")')
+_BARE_AFTER_INCH_RE = re.compile(r'(?<=\d" x )(\d+(?:\.\d+)?)(?![\w."\'’/])')
+_X_SEPARATOR_RE = re.compile(r'(?<=[\d"])\s*[X×]\s*(?=\d)')
+_QUANTITY_RE = re.compile(r'(?:(?<![\w.])(-)\s*)?' + _NUMBER_PATTERN)
+_DIAMETER_RE = re.compile(r'Ø|⌀|\bDIA(?:METER)?\b\.?|\bDIAM\b\.?')
+_DASH_RE = re.compile(r'\s*[‐‑‒–—−-]\s*')
+_SPACE_RE = re.compile(r'\s+')
+_SPACE_BEFORE_PUNCT_RE = re.compile(r'\s+(?=[,;])')
+
+
+def _as_text(value: Any) -> Optional[str]:
+    """Turn a field value into a string; the model sometimes returns lists or objects."""
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (list, tuple)):
+        return ", ".join(str(v) for v in value if v is not None)
+    if isinstance(value, dict):
+        return json.dumps(value, sort_keys=True, ensure_ascii=False)
+    return str(value)
+
+
+def _clean(value: Any) -> str:
+    """Uppercase, trim and collapse whitespace; empty/N/A-like values become ''."""
+    return _clean_text(_as_text(value))
+
+
+@lru_cache(maxsize=None)
+def _clean_text(value: Optional[str]) -> str:
+    if value is None:
+        return ""
+    text = _SPACE_RE.sub(" ", value).strip().upper()
+    # "NOT SHOWN", "NOT EXPLICITLY LISTED", ...
+    return "" if text in _EMPTY_VALUES or text.startswith("NOT ") else text
+
+
+def _format_inches(value: float) -> str:
+    """Format a size in inches without a trailing '.0' (1.5 -> 1.5\", 2.0 -> 2\")."""
+    return f'{value:g}"'
+
+
+def _number_value(whole, num, den, frac_num, frac_den, decimal) -> Optional[float]:
+    """Value of a _NUMBER_PATTERN match, or None for a zero denominator."""
+    if whole is not None:
+        return int(whole) + int(num) / int(den) if int(den) else None
+    if frac_num is not None:
+        return int(frac_num) / int(frac_den) if int(frac_den) else None
+    return float(decimal)
+
+
+def _size_to_inches(match) -> str:
+    whole, num, den, frac_num, frac_den, decimal, inch_mark, other_unit, diameter = match.groups()
+    # Feet and metric sizes are kept as written
+    if other_unit:
+        return match.group(0)
+    text, start = match.string, match.start()
+    window_start = max(0, start - _SIZE_PREFIX_WINDOW)
+    # Bare numbers are only sizes when they are fractions or marked as a diameter
+    if not (inch_mark or diameter or whole is not None or frac_num is not None
+            or _DIAMETER_PREFIX_RE.search(text, window_start, start)):
+        return match.group(0)
+    if _NOT_SIZE_PREFIX_RE.search(text, window_start, start):
+        return match.group(0)
+    value = _number_value(whole, num, den, frac_num, frac_den, decimal)
+    if value is None:
+        return match.group(0)
+    return _format_inches(round(value, 4)) + (diameter or "")
+
+
+@lru_cache(maxsize=None)
+def _normalize_spec(text: Optional[str]) -> str:
+    text = _clean(text)
+    if not text:
+        return ""
+    text = _DASH_RE.sub("-", text)
+    # "HUH 9" and "HUH-9" refer to the same tag
+    text = re.sub(r'^([A-Z]+) (\d+)$', r'\1-\2', text)
+    return text
+
+
+def normalize_spec(value: Any) -> str:
+    """
+    Normalize a model or specification reference.
+
+    Args:
+        value: Raw `model_or_spec` value from the model output
+
+    Returns:
+        str: Canonical spec, e.g. "huh 9" / "HUH–9" -> "HUH-9"; '' when not available
+    """
+    return _normalize_spec(_as_text(value))
+
+
+@lru_cache(maxsize=None)
+def _normalize_dimensions(text: Optional[str]) -> str:
+    text = _clean(text)
+    if not text:
+        return ""
+    text = _SIZE_RE.sub(_size_to_inches, text)
+    if "Ø" in text or "⌀" in text or "DIA" in text:
+        text = _SPACE_BEFORE_PUNCT_RE.sub("", _DIAMETER_RE.sub(" ", text))
+    if "X" in text or "×" in text:
+        text = _X_SEPARATOR_RE.sub(" x ", text)
+        if " x " in text:
+            text = _BARE_BEFORE_INCH_RE.sub(r'\1"', text)
+            text = _BARE_AFTER_INCH_RE.sub(r'\1"', text)
+    text = _SPACE_RE.sub(" ", text).strip(" ,;")
+    return "" if text in _EMPTY_VALUES else text
+
+
+def normalize_dimensions(value: Any) -> str:
+    """
+    Normalize a dimensions string so equivalent sizes compare equal.
+
+    Sizes with an inch mark or a diameter marker, and fractions, are converted to decimal
+    inches and diameter markers are dropped, so '1-1/2" Ø', '1 1/2 in. dia' and '1.5"' all
+    become '1.5"', and reducer sizes such as '1-1/2"X3/4"' become '1.5" x 0.75"'. Other
+    numbers (SCH 40, DN50) and sizes in feet or metric units are kept as cleaned text.
+
+    Args:
+        value: Raw `dimensions` value from the model output
+
+    Returns:
+        str: Canonical dimensions; '' when not available
+    """
+    return _normalize_dimensions(_as_text(value))
+
+
+def normalize_quantity(value: Any) -> Optional[float]:
+    """
+    Parse a quantity reported as a string or number.
+
+    Args:
+        value: Raw `quantity` value, e.g. "4", 4, "4 EA", "approx. 3", "1/2"
+
+    Returns:
+        Optional[float]: Parsed quantity, or None when no number is present or it is negative
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) if value >= 0 else None
+    value = _as_text(value)
+    if value is None:
+        return None
+    match = _QUANTITY_RE.search(value.replace(",", ""))
+    if not match or match.group(1):
+        return None
+    return _number_value(*match.groups()[1:])
+
+
+def _confidence(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def aggregate_bom(combined_results: Dict[str, Any], sum_across_pages: bool = True,
+                  dedupe_within_page: bool = False) -> List[Dict[str, Any]]:
+    """
+    Consolidate the per-page `plumbing_items` into a single bill of materials.
+
+    Items are grouped by normalized item type, spec, dimensions and mounting type and
+    their quantities are summed. Quantities that cannot be read, or are negative, are not
+    guessed: they add nothing to `quantity` and are counted in `unparsed_quantities`.
+
+    Items repeated across sheets (e.g. a plan sheet and its enlarged detail) are not
+    detected as duplicates: the page results carry no sheet or location references to tell
+    them apart from separate items, so they are summed. `pages` lists where each row was found.
+
+    Args:
+        combined_results (dict): Per-page results as produced by run_parallel_processing
+        sum_across_pages (bool): Whether to sum quantities across pages; when False an item
+            repeated on several sheets keeps its largest page quantity (default: True)
+        dedupe_within_page (bool): Keep only the largest quantity of identical items on the
+            same page instead of summing them. This is lossy: an item listed once per
+            location is undercounted (default: False)
+
+    Returns:
+        List[Dict[str, Any]]: BOM rows with the keys in BOM_COLUMNS, sorted by type, spec and size
+    """
+    # (page, item key) -> per-page totals
+    page_items = {}
+    for page_key, page_result in combined_results.items():
+        if not isinstance(page_result, dict):
+            continue
+        items = page_result.get("plumbing_items")
+        if not isinstance(items, list):
+            continue
+        page = str(page_result.get("page", page_key))
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            raw_dimensions = _as_text(item.get("dimensions"))
+            key = (
+                _clean(item.get("item_type")),
+                normalize_spec(item.get("model_or_spec")),
+                normalize_dimensions(raw_dimensions),
+                _clean(item.get("mounting_type")),
+            )
+            quantity = normalize_quantity(item.get("quantity"))
+            confidence = _confidence(item.get("confidence"))
+
+            entry = page_items.get((page, key))
+            if entry is None:
+                entry = page_items[(page, key)] = {
+                    "quantity": 0.0, "unparsed": 0, "occurrences": 0, "confidence": None, "raw_dimensions": {}
+                }
+            if quantity is None:
+                entry["unparsed"] += 1
+            elif dedupe_within_page:
+                entry["quantity"] = max(entry["quantity"], quantity)
+            else:
+                entry["quantity"] += quantity
+            entry["occurrences"] += 1
+            if confidence is not None and (entry["confidence"] is None or confidence < entry["confidence"]):
+                entry["confidence"] = confidence
+            raw_dimensions = (raw_dimensions or "").strip()
+            if raw_dimensions:
+                # dict as an insertion-ordered set
+                entry["raw_dimensions"][raw_dimensions] = None
+
+    rows = {}
+    for (page, key), entry in page_items.items():
+        row = rows.get(key)
+        if row is None:
+            row = rows[key] = {
+                "item_type": key[0],
+                "model_or_spec": key[1],
+                "dimensions": key[2],
+                "raw_dimensions": {},
+                "mounting_type": key[3],
+                "quantity": 0.0,
+                "unparsed_quantities": 0,
+                "occurrences": 0,
+                "pages": [],
+                "min_confidence": None,
+            }
+        if sum_across_pages:
+            row["quantity"] += entry["quantity"]
+        else:
+            row["quantity"] = max(row["quantity"], entry["quantity"])
+        row["unparsed_quantities"] += entry["unparsed"]
+        row["occurrences"] += entry["occurrences"]
+        row["pages"].append(page)
+        confidence = entry["confidence"]
+        if confidence is not None and (row["min_confidence"] is None or confidence < row["min_confidence"]):
+            row["min_confidence"] = confidence
+        row["raw_dimensions"].update(entry["raw_dimensions"])
+
+    def page_order(page):
+        return (0, int(page)) if page.isdigit() else (1, page)
+
+    bom = sorted(rows.values(), key=lambda r: (r["item_type"], r["model_or_spec"], r["dimensions"], r["mounting_type"]))
+    for row in bom:
+        row["pages"] = ",".join(sorted(row["pages"], key=page_order))
+        row["raw_dimensions"] = " | ".join(row["raw_dimensions"])
+        if row["quantity"].is_integer():
+            row["quantity"] = int(row["quantity"])
+    return bom
+
+
+def save_bom_csv(bom: List[Dict[str, Any]], output_path: str) -> str:
+    """
+    Save the bill of materials as a CSV file.
+
+    Args:
+        bom (List[Dict[str, Any]]): Rows returned by aggregate_bom
+        output_path (str): Path of the CSV file
+
+    Returns:
+        str: Path of the written file
+    """
+    with open(output_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=BOM_COLUMNS)
+        writer.writeheader()
+        writer.writerows(bom)
+    return output_path
+
+
+def save_bom_parquet(bom: List[Dict[str, Any]], output_path: str) -> str:
+    """
+    Save the bill of materials as a Parquet file. Requires pyarrow.
+
+    Args:
+        bom (List[Dict[str, Any]]): Rows returned by aggregate_bom
+        output_path (str): Path of the Parquet file
+
+    Returns:
+        str: Path of the written file
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("pyarrow is required for Parquet output: pip install pyarrow")
+
+    table = pa.Table.from_pydict({
+        "item_type": pa.array([r["item_type"] for r in bom], pa.string()),
+        "model_or_spec": pa.array([r["model_or_spec"] for r in bom], pa.string()),
+        "dimensions": pa.array([r["dimensions"] for r in bom], pa.string()),
+        "raw_dimensions": pa.array([r["raw_dimensions"] for r in bom], pa.string()),
+        "mounting_type": pa.array([r["mounting_type"] for r in bom], pa.string()),
+        "quantity": pa.array([float(r["quantity"]) for r in bom], pa.float64()),
+        "unparsed_quantities": pa.array([r["unparsed_quantities"] for r in bom], pa.int64()),
+        "occurrences": pa.array([r["occurrences"] for r in bom], pa.int64()),
+        "pages": pa.array([r["pages"] for r in bom], pa.string()),
+        "min_confidence": pa.array([r["min_confidence"] for r in bom], pa.float64()),
+    })
+    pq.write_table(table, output_path)
+    return output_path
+
+
+def save_bom(bom: List[Dict[str, Any]], output_dir: str, formats: List[str] = ("csv",)) -> List[str]:
+    """
+    Save the bill of materials in each of the requested formats.
+
+    Args:
+        bom (List[Dict[str, Any]]): Rows returned by aggregate_bom
+        output_dir (str): Directory to save output files
+        formats (List[str]): Any of "csv" and "parquet" (default: csv)
+
+    Returns:
+        List[str]: Paths of the written files
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    writers = {"csv": save_bom_csv, "parquet": save_bom_parquet}
+    output_files = []
+    for fmt in formats:
+        if fmt not in writers:
+            raise ValueError(f"Unsupported BOM format: {fmt}")
+        output_files.append(writers[fmt](bom, os.path.join(output_dir, f"bill_of_materials.{fmt}")))
+    return output_files
+
+
+if __name__ == "__main__":
+    # Example usage
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Aggregate combined page results into a bill of materials.')
+    parser.add_argument('--input_json', default='output/combined_results.json', help='Path to combined_results.json')
+    parser.add_argument('--output_dir', default='output', help='Directory to save output files')
+    parser.add_argument('--formats', nargs='+', default=['csv'], choices=['csv', 'parquet'], help='Output formats')
+    parser.add_argument('--no_sum_across_pages', action='store_true', help='Count items repeated on several pages once')
+    parser.add_argument('--dedupe_within_page', action='store_true',
+                        help='Keep the largest quantity of identical items on a page instead of summing (lossy)')
+
+    args = parser.parse_args()
+
+    with open(args.input_json, 'r') as f:
+        combined_results = json.load(f)
+
+    bom = aggregate_bom(
+        combined_results,
+        sum_across_pages=not args.no_sum_across_pages,
+        dedupe_within_page=args.dedupe_within_page
+    )
+    for output_file in save_bom(bom, args.output_dir, args.formats):
+        print(f"✅ Bill of materials ({len(bom)} rows) saved to {output_file}")
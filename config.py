@@ -21,5 +21,23 @@ UNSTRUCTURED_API_URL = "https://api.unstructuredapp.io/general/v0/general"
 # OpenAI settings
 OPENAI_MODEL = "gpt-4.1-2025-04-14"  # Default model for OpenAI API calls
 
+# Model cascade settings
+CASCADE_ENABLED = False  # Send pages to CASCADE_FAST_MODEL first and escalate only uncertain pages to OPENAI_MODEL
+CASCADE_FAST_MODEL = "gpt-4.1-mini-2025-04-14"  # Faster, cheaper model used for the first pass
+CASCADE_CONFIDENCE_THRESHOLD = 0.7  # Pages with any item below this confidence are re-run on OPENAI_MODEL
+CASCADE_ESCALATE_EMPTY_PAGES = True  # Re-run pages on which the fast model found no plumbing items
+
+# Model prices in USD per 1M tokens (input, output), used to report spend per run
+MODEL_PRICING = {
+    "gpt-4.1-2025-04-14": (2.00, 8.00),
+    "gpt-4.1-mini-2025-04-14": (0.40, 1.60),
+    "gpt-4.1-nano-2025-04-14": (0.10, 0.40),
+}
+
+# Bill of materials settings
+BOM_OUTPUT_FORMATS = ["csv"]  # Any of "csv" and "parquet" (parquet requires pyarrow)
+BOM_SUM_ACROSS_PAGES = True  # Sum quantities across pages; False counts items repeated on several sheets once
+BOM_DEDUPE_WITHIN_PAGE = False  # Keep the largest quantity of identical items on a page instead of summing (lossy)
+
 # File size thresholds (in MB)
 LARGE_FILE_THRESHOLD = 5  # Files larger than this will get a warning 
\ No newline at end of file
@@ -4,15 +4,20 @@ import asyncio
 from pdf_splitter import split_pdf
 from parallel_processor import run_parallel_processing
 from contextual_text import process_pdf_pages_parallel
+from bom_aggregator import aggregate_bom, save_bom
 from config import (
     INPUT_PDF,
     OUTPUT_DIR,
     UNSTRUCTURED_API_KEY,
     OPENAI_API_KEY,
-    SKIP_FIRST_PAGE
+    SKIP_FIRST_PAGE,
+    CASCADE_ENABLED,
+    BOM_OUTPUT_FORMATS,
+    BOM_SUM_ACROSS_PAGES,
+    BOM_DEDUPE_WITHIN_PAGE
 )
 
-async def process_pdf(input_pdf, output_dir, unstructured_api_key, openai_api_key, skip_first_page=True):
+async def process_pdf(input_pdf, output_dir, unstructured_api_key, openai_api_key, skip_first_page=True, cascade=False):
     """
     Process a PDF file in parallel.
     
@@ -22,6 +27,7 @@ async def process_pdf(input_pdf, output_dir, unstructured_api_key, openai_api_ke
         unstructured_api_key (str): Unstructured Cloud API key
         openai_api_key (str): OpenAI API key
         skip_first_page (bool): Whether to skip the first page (default: True)
+        cascade (bool): Whether to use the fast-model-first cascade (default: False)
         
     Returns:
         dict: Combined structured data for all pages
@@ -43,7 +49,9 @@ async def process_pdf(input_pdf, output_dir, unstructured_api_key, openai_api_ke
         pdf_files=pdf_files,
         output_image_dir=image_dir,
         unstructured_api_key=unstructured_api_key,
-        openai_api_key=openai_api_key
+        openai_api_key=openai_api_key,
+        cascade=cascade,
+        report_path=os.path.join(output_dir, 'cascade_report.json')
     )
     
     return combined_results
@@ -55,7 +63,8 @@ async def main():
         output_dir=OUTPUT_DIR,
         unstructured_api_key=UNSTRUCTURED_API_KEY,
         openai_api_key=OPENAI_API_KEY,
-        skip_first_page=SKIP_FIRST_PAGE
+        skip_first_page=SKIP_FIRST_PAGE,
+        cascade=CASCADE_ENABLED
     )
     
     # Save the combined results
@@ -64,6 +73,15 @@ async def main():
         json.dump(combined_results, f, indent=2)
     
     print(f"✅ Combined results saved to {output_json_path}")
+    
+    # Consolidate items across pages into a bill of materials
+    bom = aggregate_bom(
+        combined_results,
+        sum_across_pages=BOM_SUM_ACROSS_PAGES,
+        dedupe_within_page=BOM_DEDUPE_WITHIN_PAGE
+    )
+    for output_file in save_bom(bom, OUTPUT_DIR, BOM_OUTPUT_FORMATS):
+        print(f"✅ Bill of materials ({len(bom)} rows) saved to {output_file}")
     print("✅ Processing complete!")
 
 if __name__ == "__main__":
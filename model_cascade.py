@@ -0,0 +1,192 @@
+import json
+from typing import List, Dict, Any, Optional
+from openai_module import validate_structured_output
+from config import MODEL_PRICING
+
+
+def escalation_reasons(data: Any, confidence_threshold: float, escalate_empty: bool = True) -> List[str]:
+    """
+    Decide whether a page answered by the fast model should be re-run on the large model.
+
+    Args:
+        data: Parsed page response from the fast model
+        confidence_threshold (float): Minimum confidence every item must reach
+        escalate_empty (bool): Escalate pages on which no plumbing items were found (default: True)
+
+    Returns:
+        List[str]: Reasons for escalating the page, empty if the fast result can be kept
+    """
+    errors = validate_structured_output(data)
+    if errors:
+        return [f"Schema validation failed: {error}" for error in errors]
+
+    if escalate_empty and not data["plumbing_items"]:
+        return ["No plumbing items found"]
+
+    low_confidence = [
+        item for item in data["plumbing_items"]
+        if float(item["confidence"]) < confidence_threshold
+    ]
+    if low_confidence:
+        return [f"{len(low_confidence)} item(s) below confidence {confidence_threshold}"]
+    return []
+
+
+def estimate_cost(model: str, usage: Dict[str, int]) -> Optional[float]:
+    """
+    Estimate the cost of a call from its token usage.
+
+    Args:
+        model (str): Model used for the call
+        usage (dict): Token usage with prompt_tokens and completion_tokens
+
+    Returns:
+        Optional[float]: Cost in USD, or None if the model has no entry in MODEL_PRICING
+    """
+    if model not in MODEL_PRICING:
+        return None
+    input_price, output_price = MODEL_PRICING[model]
+    return (usage["prompt_tokens"] * input_price + usage["completion_tokens"] * output_price) / 1_000_000
+
+
+class CascadeStats:
+    def __init__(self, fast_model, large_model):
+        """
+        Collect per-page model calls and report throughput and spend for a run.
+
+        Args:
+            fast_model (str): Model used for the first pass
+            large_model (str): Model used for escalated pages, and the baseline for savings
+        """
+        self.fast_model = fast_model
+        self.large_model = large_model
+        self.pages = {}
+        self.wall_seconds = None
+
+    def _page(self, page_number):
+        return self.pages.setdefault(
+            page_number, {"page": page_number, "model": None, "escalated": False, "reasons": [], "calls": []}
+        )
+
+    def record_call(self, page_number, model, latency, usage):
+        """
+        Record one model call made for a page.
+
+        Args:
+            page_number (int): Page number
+            model (str): Model used for the call
+            latency (float): Duration of the call in seconds
+            usage (dict): Token usage with prompt_tokens and completion_tokens
+        """
+        page = self._page(page_number)
+        page["model"] = model
+        page["calls"].append({
+            "model": model,
+            "latency_seconds": round(latency, 3),
+            "prompt_tokens": usage["prompt_tokens"],
+            "completion_tokens": usage["completion_tokens"],
+            "cost_usd": estimate_cost(model, usage)
+        })
+
+    def record_escalation(self, page_number, reasons):
+        """
+        Mark a page as escalated to the large model.
+
+        Args:
+            page_number (int): Page number
+            reasons (List[str]): Why the fast result was rejected
+        """
+        page = self._page(page_number)
+        page["escalated"] = True
+        page["reasons"] = reasons
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Summarize the run and compare it with sending every page to the large model.
+
+        The baseline assumes every page costs and takes as long as the mean large-model call
+        made during the run. Image tokens are counted differently per model, so when no page
+        was escalated the baseline cost falls back to pricing the fast-model tokens at the
+        large model's rates, reported as "fast_token_approximation" in baseline_cost_method,
+        and no baseline model time is given.
+
+        Returns:
+            Dict[str, Any]: Run totals, estimated baseline, savings and per-page details
+        """
+        calls = [call for page in self.pages.values() for call in page["calls"]]
+        large_calls = [call for call in calls if call["model"] == self.large_model]
+        pricing_known = all(call["cost_usd"] is not None for call in calls)
+
+        cost = sum(call["cost_usd"] for call in calls) if pricing_known else None
+        baseline_cost = None
+        baseline_cost_method = None
+        if pricing_known and self.large_model in MODEL_PRICING:
+            if large_calls:
+                mean_large_usage = {
+                    "prompt_tokens": sum(call["prompt_tokens"] for call in large_calls) / len(large_calls),
+                    "completion_tokens": sum(call["completion_tokens"] for call in large_calls) / len(large_calls)
+                }
+                baseline_cost = estimate_cost(self.large_model, mean_large_usage) * len(self.pages)
+                baseline_cost_method = "large_model_mean_tokens"
+            else:
+                baseline_cost = sum(estimate_cost(self.large_model, call) for call in calls)
+                baseline_cost_method = "fast_token_approximation"
+
+        model_seconds = sum(call["latency_seconds"] for call in calls)
+        baseline_seconds = None
+        if large_calls:
+            mean_large_latency = sum(call["latency_seconds"] for call in large_calls) / len(large_calls)
+            baseline_seconds = mean_large_latency * len(self.pages)
+
+        escalated = sum(1 for page in self.pages.values() if page["escalated"])
+        summary = {
+            "fast_model": self.fast_model,
+            "large_model": self.large_model,
+            "pages": len(self.pages),
+            "escalated_pages": escalated,
+            "escalation_rate": round(escalated / len(self.pages), 3) if self.pages else 0.0,
+            "model_calls": len(calls),
+            "prompt_tokens": sum(call["prompt_tokens"] for call in calls),
+            "completion_tokens": sum(call["completion_tokens"] for call in calls),
+            "cost_usd": round(cost, 4) if cost is not None else None,
+            "baseline_cost_usd": round(baseline_cost, 4) if baseline_cost is not None else None,
+            "baseline_cost_method": baseline_cost_method,
+            "cost_savings_usd": round(baseline_cost - cost, 4) if cost is not None and baseline_cost is not None else None,
+            "model_seconds": round(model_seconds, 2),
+            "baseline_model_seconds": round(baseline_seconds, 2) if baseline_seconds is not None else None,
+            "model_seconds_saved": round(baseline_seconds - model_seconds, 2) if baseline_seconds is not None else None,
+            "wall_seconds": round(self.wall_seconds, 2) if self.wall_seconds is not None else None,
+            "pages_per_minute": round(len(self.pages) * 60 / self.wall_seconds, 2) if self.wall_seconds else None,
+            "page_details": [self.pages[page_number] for page_number in sorted(self.pages)]
+        }
+        return summary
+
+    def print_summary(self):
+        """Print a short throughput and spend report for the run."""
+        summary = self.summary()
+        print(f"Model cascade: {summary['escalated_pages']}/{summary['pages']} pages escalated "
+              f"from {self.fast_model} to {self.large_model}")
+        if summary["pages_per_minute"] is not None:
+            print(f"Throughput: {summary['pages_per_minute']} pages/min ({summary['wall_seconds']}s wall time)")
+        if summary["baseline_model_seconds"] is not None:
+            print(f"Model time: {summary['model_seconds']}s (est. {summary['baseline_model_seconds']}s "
+                  f"with {self.large_model} only, {summary['model_seconds_saved']}s saved)")
+        else:
+            print(f"Model time: {summary['model_seconds']}s")
+        if summary["cost_savings_usd"] is not None:
+            approximation = ", approximated from fast-model tokens" \
+                if summary["baseline_cost_method"] == "fast_token_approximation" else ""
+            print(f"Spend: ${summary['cost_usd']:.4f} (est. ${summary['baseline_cost_usd']:.4f} "
+                  f"with {self.large_model} only{approximation}, ${summary['cost_savings_usd']:.4f} saved)")
+        elif summary["cost_usd"] is not None:
+            print(f"Spend: ${summary['cost_usd']:.4f}")
+
+    def save(self, output_path):
+        """
+        Save the run summary as JSON.
+
+        Args:
+            output_path (str): Path of the report file
+        """
+        with open(output_path, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
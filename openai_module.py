@@ -20,7 +20,42 @@ def encode_image_to_base64(image_path: str) -> str:
     with open(image_path, "rb") as img:
         return base64.b64encode(img.read()).decode('utf-8')
 
-def extract_structured_data_from_plumbing_drawing(image_path: str, context_text: str, page_number: int, api_key: str, model: str = OPENAI_MODEL):
+# Item fields the cascade and the bill of materials rely on; the prompt lets the model omit notes
+REQUIRED_ITEM_FIELDS = ("item_type", "quantity", "confidence")
+
+def validate_structured_output(data) -> list:
+    """
+    Check a parsed response against the plumbing items schema requested in the prompt.
+    
+    Args:
+        data: Parsed JSON response
+        
+    Returns:
+        list: Schema errors found, empty if the response is valid
+    """
+    if not isinstance(data, dict):
+        return ["Response is not a JSON object"]
+    items = data.get("plumbing_items")
+    if not isinstance(items, list):
+        return ["Missing 'plumbing_items' list"]
+    
+    errors = []
+    for i, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors.append(f"Item {i} is not a JSON object")
+            continue
+        missing = [field for field in REQUIRED_ITEM_FIELDS if field not in item]
+        if missing:
+            errors.append(f"Item {i} is missing {', '.join(missing)}")
+        try:
+            confidence = float(item.get("confidence"))
+            if not 0.0 <= confidence <= 1.0:
+                errors.append(f"Item {i} confidence {confidence} is out of range")
+        except (TypeError, ValueError):
+            errors.append(f"Item {i} confidence is not numeric")
+    return errors
+
+def extract_structured_data_from_plumbing_drawing(image_path: str, context_text: str, page_number: int, api_key: str, model: str = OPENAI_MODEL, return_usage: bool = False):
     """
     Calls the multimodal LLM using the OpenAI API interface.
     This function base64 encodes the image and sends it along with the contextual text
@@ -31,10 +66,12 @@ def extract_structured_data_from_plumbing_drawing(image_path: str, context_text:
         context_text (str): Extracted contextual text from the PDF
         page_number (int): Page number
         api_key (str): OpenAI API key
-        model (str): OpenAI model to use (default: gpt-4-vision-preview)
+        model (str): OpenAI model to use (default: OPENAI_MODEL)
+        return_usage (bool): Also return the token usage of the call (default: False)
         
     Returns:
-        str: JSON response from the OpenAI API
+        str: JSON response from the OpenAI API, or a (response, usage) tuple when
+             return_usage is True, where usage holds prompt_tokens and completion_tokens
     """
     if not api_key:
         raise ValueError("OpenAI API key is required")
@@ -115,10 +152,16 @@ def extract_structured_data_from_plumbing_drawing(image_path: str, context_text:
         content = response.choices[0].message.content
         try:
             json.loads(content)  # Just to validate it's proper JSON
-            return content
         except json.JSONDecodeError:
             print(f"Warning: Response from OpenAI is not valid JSON for page {page_number}")
-            return content
+        
+        if return_usage:
+            usage = {
+                "prompt_tokens": getattr(response.usage, "prompt_tokens", 0) if response.usage else 0,
+                "completion_tokens": getattr(response.usage, "completion_tokens", 0) if response.usage else 0
+            }
+            return content, usage
+        return content
             
     except Exception as e:
         raise Exception(f"Error calling OpenAI API: {str(e)}")
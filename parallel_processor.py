@@ -1,13 +1,19 @@
 import os
 import json
 import asyncio
+import time
 from pdf2image import convert_from_path
 from contextual_text import get_clean_contextual_text_from_page, process_pdf_pages_parallel
 from openai_module import extract_structured_data_from_plumbing_drawing
+from model_cascade import CascadeStats, escalation_reasons
+from config import OPENAI_MODEL, CASCADE_FAST_MODEL, CASCADE_CONFIDENCE_THRESHOLD, CASCADE_ESCALATE_EMPTY_PAGES
 from typing import List, Dict, Any
 
 class ParallelProcessor:
-    def __init__(self, output_image_dir, unstructured_api_key, openai_api_key):
+    def __init__(self, output_image_dir, unstructured_api_key, openai_api_key, cascade=False,
+                 fast_model=CASCADE_FAST_MODEL, large_model=OPENAI_MODEL,
+                 confidence_threshold=CASCADE_CONFIDENCE_THRESHOLD,
+                 escalate_empty=CASCADE_ESCALATE_EMPTY_PAGES):
         """
         Initialize the parallel processor.
         
@@ -15,10 +21,21 @@ class ParallelProcessor:
             output_image_dir (str): Directory to save PNG images
             unstructured_api_key (str): Unstructured Cloud API key
             openai_api_key (str): OpenAI API key
+            cascade (bool): Send pages to the fast model first and escalate uncertain pages (default: False)
+            fast_model (str): Model used for the first pass in cascade mode
+            large_model (str): Model used for escalated pages, or for every page without cascade
+            confidence_threshold (float): Pages with any item below this confidence are escalated
+            escalate_empty (bool): Escalate pages on which the fast model found no plumbing items
         """
         self.output_image_dir = output_image_dir
         self.unstructured_api_key = unstructured_api_key
         self.openai_api_key = openai_api_key
+        self.cascade = cascade
+        self.fast_model = fast_model
+        self.large_model = large_model
+        self.confidence_threshold = confidence_threshold
+        self.escalate_empty = escalate_empty
+        self.cascade_stats = CascadeStats(fast_model, large_model)
         
         # Create output directory if it doesn't exist
         os.makedirs(output_image_dir, exist_ok=True)
@@ -45,20 +62,75 @@ class ParallelProcessor:
         else:
             raise Exception(f"No images generated from PDF: {pdf_path}")
         
-        # Get GPT response
-        structured_output = extract_structured_data_from_plumbing_drawing(
-            image_path=output_image_path,
+        if not self.cascade:
+            return self.run_model(output_image_path, context_text, page_number, self.large_model)
+        return self.run_cascade(output_image_path, context_text, page_number)
+    
+    def run_cascade(self, image_path, context_text, page_number):
+        """
+        Run a page on the fast model and escalate it to the large model when the answer is not trusted.
+        
+        Args:
+            image_path (str): Path to the page image
+            context_text (str): Extracted contextual text for the page
+            page_number (int): Page number
+            
+        Returns:
+            dict: Structured data for the page; the fast result is kept if the large model call fails
+        """
+        fast_result = None
+        try:
+            fast_result = self.run_model(image_path, context_text, page_number, self.fast_model)
+            reasons = escalation_reasons(fast_result, self.confidence_threshold, self.escalate_empty)
+        except Exception as e:
+            reasons = [f"Fast model call failed: {str(e)}"]
+        if not reasons:
+            return fast_result
+        
+        print(f"Escalating page {page_number} to {self.large_model}: {'; '.join(reasons)}")
+        self.cascade_stats.record_escalation(page_number, reasons)
+        try:
+            return self.run_model(image_path, context_text, page_number, self.large_model)
+        except Exception as e:
+            if not isinstance(fast_result, dict) or "error" in fast_result:
+                raise
+            print(f"Large model call failed for page {page_number}, keeping the {self.fast_model} result")
+            self.cascade_stats.record_escalation(page_number, reasons + [f"Large model call failed: {str(e)}"])
+            return fast_result
+    
+    def run_model(self, image_path, context_text, page_number, model):
+        """
+        Get the GPT response for a page and record its latency and token usage.
+        
+        Args:
+            image_path (str): Path to the page image
+            context_text (str): Extracted contextual text for the page
+            page_number (int): Page number
+            model (str): OpenAI model to use
+            
+        Returns:
+            dict: Structured data for the page, with the model that produced it under "model"
+        """
+        start_time = time.perf_counter()
+        structured_output, usage = extract_structured_data_from_plumbing_drawing(
+            image_path=image_path,
             context_text=context_text,
             page_number=page_number,
-            api_key=self.openai_api_key
+            api_key=self.openai_api_key,
+            model=model,
+            return_usage=True
         )
+        self.cascade_stats.record_call(page_number, model, time.perf_counter() - start_time, usage)
         
         # Parse the JSON response
         try:
-            return json.loads(structured_output)
+            result = json.loads(structured_output)
         except json.JSONDecodeError:
             print(f"Warning: Could not parse JSON response for page {page_number}")
-            return {"error": "Invalid JSON response", "raw_response": structured_output}
+            result = {"error": "Invalid JSON response", "raw_response": structured_output}
+        if isinstance(result, dict):
+            result["model"] = model
+        return result
     
     async def process_pages_parallel(self, pdf_files):
         """
@@ -93,7 +165,9 @@ async def run_parallel_processing(
     output_image_dir: str,
     unstructured_api_key: str,
     openai_api_key: str,
-    max_workers: int = None
+    max_workers: int = None,
+    cascade: bool = False,
+    report_path: str = None
 ) -> Dict[str, Any]:
     """
     Run parallel processing of PDF files.
@@ -104,12 +178,15 @@ async def run_parallel_processing(
         unstructured_api_key (str): Unstructured Cloud API key
         openai_api_key (str): OpenAI API key
         max_workers (int, optional): Maximum number of worker threads
+        cascade (bool): Use the fast model first and escalate low-confidence pages (default: False)
+        report_path (str, optional): Path to save the cascade throughput and spend report
         
     Returns:
         Dict[str, Any]: Combined results from all pages
     """
     print(f"Starting parallel processing with {len(pdf_files)} files")
-    processor = ParallelProcessor(output_image_dir, unstructured_api_key, openai_api_key)
+    processor = ParallelProcessor(output_image_dir, unstructured_api_key, openai_api_key, cascade=cascade)
+    start_time = time.perf_counter()
     
     # Process all pages in parallel
     tasks = []
@@ -138,4 +215,11 @@ async def run_parallel_processing(
         print(f"Error during processing: {str(e)}")
         print(f"Traceback: {traceback.format_exc()}")
     
+    if cascade:
+        processor.cascade_stats.wall_seconds = time.perf_counter() - start_time
+        processor.cascade_stats.print_summary()
+        if report_path:
+            processor.cascade_stats.save(report_path)
+            print(f"✅ Cascade report saved to {report_path}")
+    
     return results 
\ No newline at end of file
@@ -0,0 +1,156 @@
+import json
+import os
+import time
+from bom_aggregator import (
+    aggregate_bom,
+    normalize_dimensions,
+    normalize_quantity,
+    normalize_spec,
+    save_bom_csv,
+    BOM_COLUMNS
+)
+
+SAMPLE_OUTPUT = os.path.join(os.path.dirname(__file__), "output", "SAMPLE_OUTPUT.json")
+
+
+def make_item(**fields):
+    item = {
+        "item_type": "Pipe",
+        "quantity": "1",
+        "model_or_spec": "HHWS",
+        "dimensions": "1-1/2\" Ø",
+        "mounting_type": "Ceiling-mounted",
+        "confidence": "0.9",
+        "notes": "N/A"
+    }
+    item.update(fields)
+    return item
+
+
+def test_equivalent_sizes_normalize_to_the_same_key():
+    assert normalize_dimensions("1-1/2\" Ø") == "1.5\""
+    assert normalize_dimensions("1 1/2 in. dia") == "1.5\""
+    assert normalize_dimensions("1.5\"") == "1.5\""
+    assert normalize_dimensions("2 Ø") == "2\""
+    # Reducer sizes, with and without spaces around the separator
+    assert normalize_dimensions("1-1/2\"X3/4\"") == "1.5\" x 0.75\""
+    assert normalize_dimensions("1-1/2\" x 3/4\"") == "1.5\" x 0.75\""
+    assert normalize_dimensions("2x1-1/2\"") == "2\" x 1.5\""
+    assert normalize_dimensions("2\" x 1-1/2\"") == "2\" x 1.5\""
+
+
+def test_schedule_and_tag_numbers_are_not_rewritten():
+    assert normalize_dimensions("1-1/2\" SCH 40") == "1.5\" SCH 40"
+    assert normalize_dimensions("DN50") == "DN50"
+    assert normalize_dimensions("A1-2/3") == "A1-2/3"
+    assert normalize_dimensions("BE 10'-6\"") == "BE 10'-6\""
+
+
+def test_feet_and_metric_sizes_do_not_block_inch_sizes():
+    assert normalize_dimensions("1-1/2\" PIPE, 10' LONG") == "1.5\" PIPE, 10' LONG"
+    assert normalize_dimensions("3/4\" Ø, 300 MM") == "0.75\", 300 MM"
+    assert normalize_dimensions("12 mm") == "12 MM"
+
+
+def test_not_available_values_are_empty():
+    for value in ("N/A", "n/a", "", None, "Not shown", "NONE"):
+        assert normalize_dimensions(value) == ""
+        assert normalize_spec(value) == ""
+
+
+def test_spec_normalization():
+    assert normalize_spec("huh 9") == "HUH-9"
+    assert normalize_spec("HUH–9") == "HUH-9"
+
+
+def test_list_and_dict_values_do_not_crash():
+    assert normalize_dimensions(["1\"", "2\""]) == "1\", 2\""
+    assert normalize_spec({"model": "HUH-9"}) == '{"MODEL": "HUH-9"}'
+
+    results = {"2": {"page": 2, "plumbing_items": [
+        make_item(dimensions=["1\"", "2\""]),
+        make_item(model_or_spec={"model": "HUH-9"}, quantity=["3"]),
+    ]}}
+    bom = aggregate_bom(results)
+    assert len(bom) == 2
+    assert sum(row["quantity"] for row in bom) == 4
+
+
+def test_quantity_parsing():
+    assert normalize_quantity("4") == 4
+    assert normalize_quantity(4) == 4
+    assert normalize_quantity("4 EA") == 4
+    assert normalize_quantity("approx. 3") == 3
+    assert normalize_quantity("1/2") == 0.5
+    assert normalize_quantity("1-1/2") == 1.5
+    assert normalize_quantity("-2") is None
+    assert normalize_quantity(-2) is None
+    assert normalize_quantity("multiple") is None
+
+
+def test_same_page_items_are_summed():
+    results = {"2": {"page": 2, "plumbing_items": [
+        make_item(model_or_spec="WC-1", quantity="2"),
+        make_item(model_or_spec="WC-1", quantity="3"),
+    ]}}
+    assert aggregate_bom(results)[0]["quantity"] == 5
+    assert aggregate_bom(results, dedupe_within_page=True)[0]["quantity"] == 3
+
+
+def test_items_are_summed_across_pages():
+    results = {
+        "2": {"page": 2, "plumbing_items": [make_item(dimensions="1-1/2\" Ø", confidence="0.9")]},
+        "3": {"page": 3, "plumbing_items": [make_item(dimensions="1.5\"", confidence="0.8")]},
+        "4": {"error": "Invalid JSON response"},
+    }
+    bom = aggregate_bom(results)
+    assert len(bom) == 1
+    row = bom[0]
+    assert row["quantity"] == 2
+    assert row["pages"] == "2,3"
+    assert row["occurrences"] == 2
+    assert row["min_confidence"] == 0.8
+    assert row["raw_dimensions"] == "1-1/2\" Ø | 1.5\""
+    assert aggregate_bom(results, sum_across_pages=False)[0]["quantity"] == 1
+
+
+def test_unparsed_quantities_are_flagged_not_guessed():
+    results = {"2": {"page": 2, "plumbing_items": [
+        make_item(quantity="multiple"),
+        make_item(quantity="2"),
+    ]}}
+    row = aggregate_bom(results)[0]
+    assert row["quantity"] == 2
+    assert row["unparsed_quantities"] == 1
+
+
+def test_sample_output_totals(tmp_path):
+    with open(SAMPLE_OUTPUT) as f:
+        results = json.load(f)
+    bom = aggregate_bom(results)
+    # Page 10 lists the 3/4" ATF valve twice, with quantities 1 and 5
+    atf_valves = [row for row in bom if row["item_type"] == "VALVE" and row["model_or_spec"] == "3/4\" ATF"]
+    assert len(atf_valves) == 1
+    assert atf_valves[0]["quantity"] == 6
+    assert atf_valves[0]["pages"] == "10"
+
+    output_path = save_bom_csv(bom, str(tmp_path / "bill_of_materials.csv"))
+    with open(output_path, encoding="utf-8") as f:
+        assert f.readline().strip() == ",".join(BOM_COLUMNS)
+
+
+def test_aggregates_tens_of_thousands_of_items_in_seconds():
+    # Distinct dimension strings, so the normalizers are timed on cache misses
+    items = [
+        make_item(
+            model_or_spec=f"WC-{i % 200}",
+            dimensions=f"{i % 12 + 1}-{i % 7 + 1}/8\" x {i % 31 + 1}/16\" Ø, RUN {i}' LONG",
+            quantity=str(i % 5 + 1)
+        )
+        for i in range(50000)
+    ]
+    results = {str(page): {"page": page, "plumbing_items": items[page::100]} for page in range(100)}
+    start_time = time.perf_counter()
+    bom = aggregate_bom(results)
+    assert time.perf_counter() - start_time < 5
+    assert sum(row["occurrences"] for row in bom) == 50000
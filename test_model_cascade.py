@@ -0,0 +1,141 @@
+import json
+import pytest
+
+# The cascade runs inside the processing pipeline, so it needs the pipeline's dependencies
+for module in ("openai", "pdf2image", "aiohttp", "backoff"):
+    pytest.importorskip(module)
+
+import parallel_processor
+from model_cascade import CascadeStats, escalation_reasons, estimate_cost
+from config import MODEL_PRICING
+
+FAST_MODEL = "gpt-4.1-mini-2025-04-14"
+LARGE_MODEL = "gpt-4.1-2025-04-14"
+
+
+def make_page(*confidences):
+    return {
+        "page": 2,
+        "plumbing_items": [
+            {"item_type": "Pipe", "quantity": "1", "confidence": str(confidence)}
+            for confidence in confidences
+        ]
+    }
+
+
+def test_escalation_reasons():
+    assert escalation_reasons(make_page(0.9, 0.7), 0.7) == []
+    assert escalation_reasons(make_page(0.9, 0.69), 0.7) == ["1 item(s) below confidence 0.7"]
+    assert escalation_reasons(make_page(), 0.7) == ["No plumbing items found"]
+    assert escalation_reasons(make_page(), 0.7, escalate_empty=False) == []
+
+
+def test_schema_failures_are_escalated():
+    assert escalation_reasons({"error": "Invalid JSON response"}, 0.7) == [
+        "Schema validation failed: Missing 'plumbing_items' list"
+    ]
+    page = make_page(0.9)
+    del page["plumbing_items"][0]["quantity"]
+    assert escalation_reasons(page, 0.7) == ["Schema validation failed: Item 0 is missing quantity"]
+    assert escalation_reasons(make_page("high"), 0.7) == ["Schema validation failed: Item 0 confidence is not numeric"]
+
+
+def test_missing_notes_is_not_escalated():
+    # The prompt only asks for notes on low-confidence items
+    assert escalation_reasons(make_page(0.95), 0.7) == []
+
+
+def test_estimate_cost():
+    input_price, output_price = MODEL_PRICING[LARGE_MODEL]
+    usage = {"prompt_tokens": 1_000_000, "completion_tokens": 1_000_000}
+    assert estimate_cost(LARGE_MODEL, usage) == pytest.approx(input_price + output_price)
+    assert estimate_cost("unknown-model", usage) is None
+
+
+def test_baseline_from_large_model_calls():
+    stats = CascadeStats(FAST_MODEL, LARGE_MODEL)
+    stats.record_call(2, FAST_MODEL, 1.0, {"prompt_tokens": 30000, "completion_tokens": 500})
+    stats.record_call(3, FAST_MODEL, 1.0, {"prompt_tokens": 30000, "completion_tokens": 500})
+    stats.record_escalation(3, ["1 item(s) below confidence 0.7"])
+    stats.record_call(3, LARGE_MODEL, 4.0, {"prompt_tokens": 2000, "completion_tokens": 500})
+
+    summary = stats.summary()
+    large_cost = estimate_cost(LARGE_MODEL, {"prompt_tokens": 2000, "completion_tokens": 500})
+    assert summary["baseline_cost_method"] == "large_model_mean_tokens"
+    assert summary["baseline_cost_usd"] == round(2 * large_cost, 4)
+    assert summary["baseline_model_seconds"] == 8.0
+    assert summary["escalated_pages"] == 1
+    assert [page["model"] for page in summary["page_details"]] == [FAST_MODEL, LARGE_MODEL]
+
+
+def test_baseline_falls_back_to_fast_tokens():
+    stats = CascadeStats(FAST_MODEL, LARGE_MODEL)
+    usage = {"prompt_tokens": 3000, "completion_tokens": 500}
+    stats.record_call(2, FAST_MODEL, 1.0, usage)
+
+    summary = stats.summary()
+    assert summary["baseline_cost_method"] == "fast_token_approximation"
+    assert summary["baseline_cost_usd"] == round(estimate_cost(LARGE_MODEL, usage), 4)
+    assert summary["baseline_model_seconds"] is None
+
+
+@pytest.fixture
+def processor(tmp_path):
+    return parallel_processor.ParallelProcessor(
+        str(tmp_path), "unstructured-key", "openai-key", cascade=True,
+        fast_model=FAST_MODEL, large_model=LARGE_MODEL, confidence_threshold=0.7
+    )
+
+
+def stub_models(monkeypatch, responses):
+    """Replace the OpenAI call with per-model responses; an Exception value is raised."""
+    calls = []
+
+    def extract(image_path, context_text, page_number, api_key, model, return_usage):
+        calls.append(model)
+        response = responses[model]
+        if isinstance(response, Exception):
+            raise response
+        return json.dumps(response), {"prompt_tokens": 1000, "completion_tokens": 100}
+
+    monkeypatch.setattr(parallel_processor, "extract_structured_data_from_plumbing_drawing", extract)
+    return calls
+
+
+def test_confident_page_stays_on_fast_model(monkeypatch, processor):
+    calls = stub_models(monkeypatch, {FAST_MODEL: make_page(0.9)})
+    result = processor.run_cascade("page_2.png", "text", 2)
+    assert calls == [FAST_MODEL]
+    assert result["model"] == FAST_MODEL
+
+
+def test_low_confidence_page_is_escalated(monkeypatch, processor):
+    calls = stub_models(monkeypatch, {FAST_MODEL: make_page(0.5), LARGE_MODEL: make_page(0.9)})
+    result = processor.run_cascade("page_2.png", "text", 2)
+    assert calls == [FAST_MODEL, LARGE_MODEL]
+    assert result["model"] == LARGE_MODEL
+    assert processor.cascade_stats.pages[2]["escalated"]
+
+
+def test_fast_model_failure_is_escalated(monkeypatch, processor):
+    calls = stub_models(monkeypatch, {FAST_MODEL: RuntimeError("image rejected"), LARGE_MODEL: make_page(0.9)})
+    result = processor.run_cascade("page_2.png", "text", 2)
+    assert calls == [FAST_MODEL, LARGE_MODEL]
+    assert result["model"] == LARGE_MODEL
+    assert processor.cascade_stats.pages[2]["reasons"] == ["Fast model call failed: image rejected"]
+
+
+def test_fast_result_is_kept_when_large_model_fails(monkeypatch, processor):
+    stub_models(monkeypatch, {FAST_MODEL: make_page(0.5), LARGE_MODEL: RuntimeError("timeout")})
+    result = processor.run_cascade("page_2.png", "text", 2)
+    assert result["model"] == FAST_MODEL
+    assert processor.cascade_stats.pages[2]["reasons"] == [
+        "1 item(s) below confidence 0.7",
+        "Large model call failed: timeout"
+    ]
+
+
+def test_page_fails_when_both_models_fail(monkeypatch, processor):
+    stub_models(monkeypatch, {FAST_MODEL: RuntimeError("image rejected"), LARGE_MODEL: RuntimeError("timeout")})
+    with pytest.raises(RuntimeError, match="timeout"):
+        processor.run_cascade("page_2.png", "text", 2)